@@ -11,12 +11,15 @@ License: Apache-2.0
 """
 
 import argparse
+import io
 import os
+import re
 import sys
 import fnmatch
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import Optional, List, Set, TextIO
+from typing import Optional, Dict, List, Set, TextIO, Tuple
 from enum import Enum
 
 
@@ -44,34 +47,40 @@ STYLES = {
 
 # Preset ignore patterns
 PRESETS = {
-    "python": [
+    "python": frozenset([
         "__pycache__", "*.pyc", "*.pyo", "*.pyd", ".Python",
         "*.so", ".venv", "venv", "ENV", "env",
         "*.egg-info", "*.egg", "dist", "build",
         ".pytest_cache", ".mypy_cache", ".tox",
         "*.py[cod]", ".coverage", "htmlcov",
-    ],
-    "node": [
+    ]),
+    "node": frozenset([
         "node_modules", "npm-debug.log*", "yarn-debug.log*",
         "yarn-error.log*", ".npm", ".yarn", "dist",
         "build", ".next", ".nuxt", "coverage",
-    ],
-    "git": [
+    ]),
+    "git": frozenset([
         ".git", ".gitignore", ".gitattributes", ".gitmodules",
-    ],
-    "ide": [
+    ]),
+    "ide": frozenset([
         ".idea", ".vscode", "*.swp", "*.swo", "*~",
         ".project", ".settings", ".classpath",
         "*.sublime-*", ".atom",
-    ],
-    "all": [],  # Will be populated with all presets combined
+    ]),
 }
 
 # Combine all presets into 'all'
-PRESETS["all"] = list(set(
-    pattern for preset in ["python", "node", "git", "ide"] 
-    for pattern in PRESETS[preset]
-))
+PRESETS["all"] = frozenset().union(
+    *(PRESETS[preset] for preset in ("python", "node", "git", "ide"))
+)
+
+
+# Scanned directory entry: (lowercase name, name, is_dir, path).
+# Everything the walker needs is extracted once during the scan, so
+# later stages only index into the tuple and the DirEntry can be freed.
+# path is only set for directories the walker descends into; it is None
+# for files and for symlinked directories.
+ScanItem = Tuple[str, str, bool, Optional[str]]
 
 
 # =============================================================================
@@ -91,6 +100,7 @@ class TreeConfig:
     use_color: bool = False
     ignore_patterns: Set[str] = field(default_factory=set)
     ignore_hidden: bool = False
+    jobs: int = 1
 
 
 @dataclass
@@ -112,12 +122,14 @@ class Colors:
     RESET = "\033[0m"
     BG_BLACK = "\033[40m"
     
+    # Green-on-black wrapping for colored output, built once
+    PREFIX = BG_BLACK + BRIGHT_GREEN
+    SUFFIX = RESET
+    
     @classmethod
     def colorize(cls, text: str, enabled: bool = True) -> str:
         """Apply green-on-black coloring if enabled."""
-        if not enabled:
-            return text
-        return f"{cls.BG_BLACK}{cls.BRIGHT_GREEN}{text}{cls.RESET}"
+        return cls.PREFIX + text + cls.SUFFIX if enabled else text
 
 
 # =============================================================================
@@ -129,20 +141,69 @@ class IgnorePatternMatcher:
     
     def __init__(self, patterns: Set[str]):
         self.patterns = patterns
+        
+        # Split patterns once so matching does not re-translate globs.
+        # Patterns without glob characters become plain set lookups.
+        literals: Set[str] = set()
+        dir_literals: Set[str] = set()
+        globs: List[str] = []
+        dir_globs: List[str] = []
+        for pattern in patterns:
+            # Directory-specific patterns (ending with /)
+            if pattern.endswith('/'):
+                pattern = pattern[:-1]
+                if any(c in pattern for c in '*?['):
+                    dir_globs.append(pattern)
+                else:
+                    dir_literals.add(os.path.normcase(pattern))
+            else:
+                # Any pattern also matches its own exact name
+                literals.add(os.path.normcase(pattern))
+                if any(c in pattern for c in '*?['):
+                    globs.append(pattern)
+        
+        self._literals = frozenset(literals)
+        self._dir_literals = frozenset(dir_literals)
+        self._re_any = self._compile(globs)
+        self._re_dir = self._compile(dir_globs)
+        
+        # Results per (name, is_dir); basenames such as __init__.py or
+        # node_modules repeat throughout a tree
+        self._cache: Dict[Tuple[str, bool], bool] = {}
+    
+    @staticmethod
+    def _compile(globs: List[str]) -> Optional[re.Pattern]:
+        """Combine glob patterns into a single compiled regex alternation."""
+        if not globs:
+            return None
+        # Same case handling as fnmatch.fnmatch
+        return re.compile("|".join(
+            fnmatch.translate(os.path.normcase(glob)) for glob in globs
+        ))
     
     def should_ignore(self, name: str, is_dir: bool = False) -> bool:
         """Check if a file/directory should be ignored."""
-        for pattern in self.patterns:
-            # Handle directory-specific patterns (ending with /)
-            if pattern.endswith('/'):
-                if is_dir and fnmatch.fnmatch(name, pattern[:-1]):
-                    return True
-            # Handle glob patterns
-            elif fnmatch.fnmatch(name, pattern):
-                return True
-            # Exact match
-            elif name == pattern:
-                return True
+        key = (name, is_dir)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        result = self._match(name, is_dir)
+        self._cache[key] = result
+        return result
+    
+    def _match(self, name: str, is_dir: bool) -> bool:
+        """Match a name against the patterns, bypassing the cache."""
+        name = os.path.normcase(name)
+        
+        # Literal names first, then the glob patterns
+        if name in self._literals:
+            return True
+        if is_dir and name in self._dir_literals:
+            return True
+        if self._re_any is not None and self._re_any.match(name):
+            return True
+        if is_dir and self._re_dir is not None and self._re_dir.match(name):
+            return True
         return False
     
     @classmethod
@@ -170,100 +231,246 @@ class TreeGenerator:
         self.config = config
         self.stats = TreeStats()
         self.style_chars = STYLES[config.style]
+        (self._branch, self._last_branch,
+         self._vertical, self._space) = self.style_chars
         self.matcher = IgnorePatternMatcher(config.ignore_patterns)
-        self.output_lines: List[str] = []
+        # Pick the sort strategy once instead of per directory
+        self._sort = (self._sort_alpha if config.alphabetic
+                      else self._sort_dirs_first)
+        self._buf = io.StringIO()
+        # Traversal works on plain path strings and DirEntry.path,
+        # so no Path objects are created per directory
+        self._root_str = str(config.root_path)
     
     def generate(self) -> str:
         """Generate the complete tree representation."""
-        self.output_lines = []
+        self._buf = io.StringIO()
         self.stats = TreeStats()
         
         root_name = self.config.root_path.name or str(self.config.root_path)
-        self.output_lines.append(root_name)
+        self._buf.write(root_name)
+        self._buf.write("\n")
         
-        self._walk_directory(self.config.root_path, "", 0)
+        if self.config.jobs > 1:
+            with ThreadPoolExecutor(max_workers=self.config.jobs) as executor:
+                self._walk_directory(self._buf, self.stats, self._root_str,
+                                     "", 0, executor)
+        else:
+            self._walk_directory(self._buf, self.stats, self._root_str, "", 0)
         
         if self.config.show_stats:
             self._append_stats()
         
-        return "\n".join(self.output_lines)
+        # Every line is newline-terminated; drop the final newline only
+        return self._buf.getvalue()[:-1]
+    
+    def _walk_subtree(self, path: str, prefix: str,
+                      depth: int) -> Tuple[str, TreeStats]:
+        """Render a subtree into a separate buffer (used by worker threads)."""
+        buf = io.StringIO()
+        stats = TreeStats()
+        self._walk_directory(buf, stats, path, prefix, depth)
+        return buf.getvalue(), stats
     
-    def _walk_directory(self, path: Path, prefix: str, depth: int) -> None:
-        """Recursively walk directory and build tree representation."""
-        # Check depth limit
-        if self.config.max_depth is not None and depth >= self.config.max_depth:
+    @staticmethod
+    def _merge_stats(stats: TreeStats, sub_stats: TreeStats) -> None:
+        """Add the statistics of a separately walked subtree to stats."""
+        stats.total_dirs += sub_stats.total_dirs
+        stats.total_files += sub_stats.total_files
+        if sub_stats.max_depth_reached > stats.max_depth_reached:
+            stats.max_depth_reached = sub_stats.max_depth_reached
+    
+    def _walk_directory(self, buf: TextIO, stats: TreeStats, path: str,
+                        prefix: str, depth: int,
+                        executor: Optional[Executor] = None) -> None:
+        """Walk directory and write its tree representation to buf.
+        
+        Uses an explicit stack of per-directory iterators instead of
+        recursion, which keeps the depth-first output order without
+        being bound by the interpreter's recursion limit.
+        
+        With an executor, the subdirectories directly below path are
+        walked concurrently by _walk_subtree. Directory scanning is
+        dominated by filesystem calls that release the GIL, so the
+        subtrees overlap their I/O; each renders into its own buffer,
+        which is spliced in at its place in display order.
+        """
+        max_depth = self.config.max_depth
+        if max_depth is not None and depth >= max_depth:
             return
         
         # Update max depth stat
-        if depth > self.stats.max_depth_reached:
-            self.stats.max_depth_reached = depth
+        if depth > stats.max_depth_reached:
+            stats.max_depth_reached = depth
         
-        # Get and filter entries
-        try:
-            entries = list(path.iterdir())
-        except PermissionError:
+        entries = self._scan_directory(path)
+        if not entries:
             return
         
-        # Filter entries
-        filtered_entries = []
-        for entry in entries:
-            # Skip hidden files if configured
-            if self.config.ignore_hidden and entry.name.startswith('.'):
-                continue
-            
-            # Check ignore patterns
-            if self.matcher.should_ignore(entry.name, entry.is_dir()):
-                continue
-            
-            # Filter by type
-            if self.config.dirs_only and not entry.is_dir():
-                continue
-            if self.config.files_only and entry.is_dir():
-                continue
-            
-            filtered_entries.append(entry)
-        
-        # Sort entries
-        if self.config.alphabetic:
-            filtered_entries.sort(key=lambda e: e.name.lower())
-        else:
-            # Default: directories first, then files
-            dirs = sorted([e for e in filtered_entries if e.is_dir()], 
-                         key=lambda e: e.name.lower())
-            files = sorted([e for e in filtered_entries if e.is_file()], 
-                          key=lambda e: e.name.lower())
-            filtered_entries = dirs + files
+        branch = self._branch
+        last_branch = self._last_branch
+        vertical = self._vertical
+        space = self._space
+        write = buf.write
+        scan = self._scan_directory
         
-        # Generate tree lines
-        branch, last_branch, vertical, space = self.style_chars
+        # Submit every subtree below path before writing anything
+        subtrees: Dict[str, Future] = {}
+        if executor is not None and (max_depth is None
+                                     or depth + 1 < max_depth):
+            last = entries[-1]
+            for item in entries:
+                if item[3] is not None:
+                    subtrees[item[3]] = executor.submit(
+                        self._walk_subtree, item[3],
+                        prefix + (space if item is last else vertical),
+                        depth + 1,
+                    )
         
-        for i, entry in enumerate(filtered_entries):
-            is_last = (i == len(filtered_entries) - 1)
-            connector = last_branch if is_last else branch
-            
-            # Add entry to output
-            line = f"{prefix}{connector}{entry.name}"
-            if entry.is_dir():
-                line += "/"
-                self.stats.total_dirs += 1
+        # Each frame: (remaining entries, last entry, prefix, depth)
+        stack = [(iter(entries), entries[-1], prefix, depth)]
+        while stack:
+            it, last, prefix, depth = stack[-1]
+            for item in it:
+                _, name, is_dir_flag, entry_path = item
+                is_last = item is last
+                connector = last_branch if is_last else branch
+                
+                # Add entry to output
+                write(prefix)
+                write(connector)
+                write(name)
+                if not is_dir_flag:
+                    write("\n")
+                    stats.total_files += 1
+                    continue
+                
+                write("/\n")
+                stats.total_dirs += 1
+                
+                # Symlinked directories are shown but not walked
+                if entry_path is None:
+                    continue
+                
+                # Prune at the depth limit before the directory is opened
+                child_depth = depth + 1
+                if max_depth is not None and child_depth >= max_depth:
+                    continue
+                
+                # Splice in a subtree rendered by a worker thread
+                if subtrees:
+                    future = subtrees.pop(entry_path, None)
+                    if future is not None:
+                        lines, sub_stats = future.result()
+                        write(lines)
+                        self._merge_stats(stats, sub_stats)
+                        continue
+                
+                if child_depth > stats.max_depth_reached:
+                    stats.max_depth_reached = child_depth
+                
+                # Descend into the directory; its parent resumes afterwards.
+                # The child prefix is only built for directories that
+                # actually have entries to draw.
+                children = scan(entry_path)
+                if children:
+                    new_prefix = prefix + (space if is_last else vertical)
+                    stack.append(
+                        (iter(children), children[-1], new_prefix, child_depth)
+                    )
+                    break
             else:
-                self.stats.total_files += 1
-            
-            self.output_lines.append(line)
-            
-            # Recurse into directories
-            if entry.is_dir():
-                new_prefix = prefix + (space if is_last else vertical)
-                self._walk_directory(entry, new_prefix, depth + 1)
+                stack.pop()
+    
+    def _scan_directory(self, path: str) -> List[ScanItem]:
+        """List the filtered and sorted entries of a single directory.
+        
+        Each entry is a (lowercase name, name, is_dir, path) tuple, so
+        sorting compares precomputed keys instead of calling str.lower()
+        on every comparison.
+        """
+        # Get and filter entries. os.scandir yields DirEntry objects whose
+        # type checks are answered from the directory listing itself, so
+        # only symlinks need an extra stat call. Symlinked directories are
+        # listed as directories but never descended into, which keeps
+        # symlink cycles from looping forever.
+        dirs: List[ScanItem] = []
+        files: List[ScanItem] = []
+        
+        # Bind per-entry lookups to locals for the hot loop
+        ignore_hidden = self.config.ignore_hidden
+        dirs_only = self.config.dirs_only
+        files_only = self.config.files_only
+        should_ignore = self.matcher.should_ignore
+        
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    name = entry.name
+                    
+                    # Skip hidden files if configured
+                    if ignore_hidden and name[:1] == '.':
+                        continue
+                    
+                    # Resolving a symlink can fail (loops, links through
+                    # files, unreadable targets); list such entries as
+                    # files instead of aborting the whole directory
+                    try:
+                        is_dir_flag = entry.is_dir()
+                        is_link = is_dir_flag and entry.is_symlink()
+                    except OSError:
+                        is_dir_flag = is_link = False
+                    
+                    # Check ignore patterns
+                    if should_ignore(name, is_dir_flag):
+                        continue
+                    
+                    # Filter by type and partition in the same pass.
+                    # Everything that is not a directory (including broken
+                    # symlinks, FIFOs and sockets) is listed as a file.
+                    if is_dir_flag:
+                        if files_only:
+                            continue
+                        # Symlinked directories are not descended into
+                        walk_path = None if is_link else entry.path
+                        dirs.append((name.lower(), name, True, walk_path))
+                    else:
+                        if dirs_only:
+                            continue
+                        files.append((name.lower(), name, False, None))
+        except PermissionError:
+            return []
+        
+        return self._sort(dirs, files)
+    
+    @staticmethod
+    def _sort_alpha(dirs: List[ScanItem],
+                    files: List[ScanItem]) -> List[ScanItem]:
+        """Sort directories and files together alphabetically."""
+        entries = dirs + files
+        if len(entries) > 1:
+            entries.sort()
+        return entries
+    
+    @staticmethod
+    def _sort_dirs_first(dirs: List[ScanItem],
+                         files: List[ScanItem]) -> List[ScanItem]:
+        """Sort directories first, then files (default order)."""
+        # Leaf-heavy trees have many empty or single-entry lists
+        if len(dirs) > 1:
+            dirs.sort()
+        if len(files) > 1:
+            files.sort()
+        return dirs + files
     
     def _append_stats(self) -> None:
         """Append statistics to output."""
-        self.output_lines.append("")
-        self.output_lines.append("-" * 40)
-        self.output_lines.append(f"Directories: {self.stats.total_dirs}")
-        self.output_lines.append(f"Files:       {self.stats.total_files}")
-        self.output_lines.append(f"Max Depth:   {self.stats.max_depth_reached}")
-        self.output_lines.append("-" * 40)
+        self._buf.write("\n")
+        self._buf.write("-" * 40 + "\n")
+        self._buf.write(f"Directories: {self.stats.total_dirs}\n")
+        self._buf.write(f"Files:       {self.stats.total_files}\n")
+        self._buf.write(f"Max Depth:   {self.stats.max_depth_reached}\n")
+        self._buf.write("-" * 40 + "\n")
 
 
 # =============================================================================
@@ -276,30 +483,29 @@ class OutputFormatter:
     @staticmethod
     def format_markdown(tree: str, root_path: str) -> str:
         """Format tree output for Markdown files."""
-        lines = [
-            f"# Directory Structure: `{root_path}`",
-            "",
-            "```",
-            tree,
-            "```",
-            "",
-            f"*Generated with TreeTool v{VERSION}*",
-        ]
-        return "\n".join(lines)
+        return (
+            f"# Directory Structure: `{root_path}`\n"
+            "\n"
+            "```\n"
+            f"{tree}\n"
+            "```\n"
+            "\n"
+            f"*Generated with TreeTool v{VERSION}*"
+        )
     
     @staticmethod
     def format_text(tree: str, root_path: str) -> str:
         """Format tree output for plain text files."""
-        lines = [
-            f"Directory Structure: {root_path}",
-            "=" * 50,
-            "",
-            tree,
-            "",
-            "=" * 50,
-            f"Generated with TreeTool v{VERSION}",
-        ]
-        return "\n".join(lines)
+        rule = "=" * 50
+        return (
+            f"Directory Structure: {root_path}\n"
+            f"{rule}\n"
+            "\n"
+            f"{tree}\n"
+            "\n"
+            f"{rule}\n"
+            f"Generated with TreeTool v{VERSION}"
+        )
 
 
 # =============================================================================
@@ -396,6 +602,17 @@ def create_parser() -> argparse.ArgumentParser:
         help="Exclude pattern (can be used multiple times)"
     )
     
+    # Performance options
+    perf_group = parser.add_argument_group("Performance Options")
+    perf_group.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Scan top-level directories with N threads "
+             "(0 = automatic, default: 1)"
+    )
+    
     # Style options
     style_group = parser.add_argument_group("Style Options")
     style_group.add_argument(
@@ -436,7 +653,7 @@ def main() -> int:
     
     # Add preset patterns
     for preset in args.preset:
-        ignore_patterns.update(PRESETS[preset])
+        ignore_patterns |= PRESETS[preset]
     
     # Add patterns from ignore file
     if args.ignore_file:
@@ -456,6 +673,11 @@ def main() -> int:
               file=sys.stderr)
         return 1
     
+    if args.jobs < 0:
+        print("Error: --jobs must not be negative", file=sys.stderr)
+        return 1
+    jobs = args.jobs or min(32, (os.cpu_count() or 1) * 4)
+    
     # Create configuration
     config = TreeConfig(
         root_path=root_path,
@@ -468,6 +690,7 @@ def main() -> int:
         use_color=args.color and not args.output,  # No color for file output
         ignore_patterns=ignore_patterns,
         ignore_hidden=args.no_hidden,
+        jobs=jobs,
     )
     
     # Generate tree
@@ -493,11 +716,18 @@ def main() -> int:
             print(f"Error writing file: {e}", file=sys.stderr)
             return 1
     else:
-        # Print to stdout
+        # Write to stdout in as few pieces as possible; the colored
+        # variant writes the ANSI wrapping separately instead of
+        # building a second copy of the tree string
+        out = sys.stdout
         if config.use_color:
-            print(Colors.colorize(tree_output))
+            out.write(Colors.PREFIX)
+            out.write(tree_output)
+            out.write(Colors.SUFFIX)
         else:
-            print(tree_output)
+            out.write(tree_output)
+        out.write("\n")
+        out.flush()
     
     return 0
 